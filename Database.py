@@ -43,12 +43,37 @@ CREATE TABLE IF NOT EXISTS Sentiment (
     PlayerID INTEGER,
     TweetID INTEGER,
     SentimentScore REAL NOT NULL, 
+    ModelVersion TEXT,
+    ChangeSeq INTEGER,
     PRIMARY KEY (PlayerID, TweetID),
     FOREIGN KEY (PlayerID) REFERENCES Players (PlayerID),
     FOREIGN KEY (TweetID) REFERENCES Tweets (TweetID) );
 
+CREATE TABLE IF NOT EXISTS RescoreCheckpoint (
+    ModelVersion TEXT PRIMARY KEY,
+    LastTweetID INTEGER NOT NULL,
+    RowsScored INTEGER NOT NULL DEFAULT 0 );
+
 """)
 
+# databases created before scores were versioned don't have the ModelVersion column
+sentiment_columns = [row[1] for row in cur.execute("PRAGMA table_info(Sentiment);")]
+if "ModelVersion" not in sentiment_columns:
+    cur.execute("ALTER TABLE Sentiment ADD COLUMN ModelVersion TEXT;")
+    conn.commit()
+
+# ChangeSeq goes up every time a score is written or rewritten, so exports can
+# pick up rescored rows and not just new ones. Older rows get their rowid
+if "ChangeSeq" not in sentiment_columns:
+    cur.execute("ALTER TABLE Sentiment ADD COLUMN ChangeSeq INTEGER;")
+    cur.execute("UPDATE Sentiment SET ChangeSeq = rowid WHERE ChangeSeq IS NULL;")
+    conn.commit()
+
+cur.execute("CREATE INDEX IF NOT EXISTS SentimentChangeSeq ON Sentiment (ChangeSeq);")
+conn.commit()
+
+# next ChangeSeq value, cheap to compute thanks to the index above
+NEXT_CHANGE_SEQ = "(SELECT COALESCE(MAX(ChangeSeq), 0) + 1 FROM Sentiment)"
 
 
 def get_player_id_by_name(player_name):
@@ -90,7 +115,7 @@ def insert_player(gov_name, team, position):
         return get_player_id_by_name(name)
 
 
-def insert_tweet(tweet_text, sentiment_score, date_time_created, player_id):
+def insert_tweet(tweet_text, sentiment_score, date_time_created, player_id, model_version=None):
     """Insert tweet and sentiment data into the database"""
 
     cur.execute(
@@ -102,24 +127,141 @@ def insert_tweet(tweet_text, sentiment_score, date_time_created, player_id):
     # Nedded when inserting into the Sentiment table as it needs the TweetID. 
     tweet_id = cur.lastrowid
     cur.execute(
-        "INSERT INTO Sentiment (PlayerID, TweetID, SentimentScore) VALUES (?, ?, ?);",
-        (player_id, tweet_id, sentiment_score)
+        f"INSERT INTO Sentiment (PlayerID, TweetID, SentimentScore, ModelVersion, ChangeSeq) VALUES (?, ?, ?, ?, {NEXT_CHANGE_SEQ});",
+        (player_id, tweet_id, sentiment_score, model_version)
     )
     conn.commit()
 
+
+def fetch_tweets_after(db_conn, last_tweet_id, chunk_size, model_version):
+    """
+    Get the next chunk of tweets after last_tweet_id that aren't already scored
+    with model_version, ordered by TweetID (keyset pagination)
+    """
+
+    # seeking on the primary key keeps every chunk just as cheap as the first,
+    # unlike OFFSET which has to walk past all the rows it skips
+    return db_conn.execute(
+        """
+        SELECT t.TweetID, t.TweetText, t.PlayerID
+        FROM Tweets t
+        LEFT JOIN Sentiment s ON s.PlayerID = t.PlayerID AND s.TweetID = t.TweetID
+        WHERE t.TweetID > ? AND t.PlayerID IS NOT NULL AND s.ModelVersion IS NOT ?
+        ORDER BY t.TweetID
+        LIMIT ?;
+        """,
+        (last_tweet_id, model_version, chunk_size)
+    ).fetchall()
+
+
+def count_tweets_after(db_conn, last_tweet_id, model_version):
+    """Count how many tweets after last_tweet_id still need scoring with model_version"""
+
+    return db_conn.execute(
+        """
+        SELECT COUNT(*)
+        FROM Tweets t
+        LEFT JOIN Sentiment s ON s.PlayerID = t.PlayerID AND s.TweetID = t.TweetID
+        WHERE t.TweetID > ? AND t.PlayerID IS NOT NULL AND s.ModelVersion IS NOT ?;
+        """,
+        (last_tweet_id, model_version)
+    ).fetchone()[0]
+
+
+def get_rescore_checkpoint(db_conn, model_version):
+    """Get (LastTweetID, RowsScored) for a rescore job, or (0, 0) if it never ran"""
+
+    result = db_conn.execute(
+        "SELECT LastTweetID, RowsScored FROM RescoreCheckpoint WHERE ModelVersion = ?;",
+        (model_version,)
+    ).fetchone()
+    return result if result else (0, 0)
+
+
+def reset_rescore_checkpoint(db_conn, model_version):
+    """Forget the progress of a rescore job, after it finishes or to start it over"""
+
+    with db_conn:
+        db_conn.execute(
+            "DELETE FROM RescoreCheckpoint WHERE ModelVersion = ?;",
+            (model_version,)
+        )
+
+
+def bulk_upsert_sentiment(db_conn, rows, model_version, last_tweet_id, rows_scored):
+    """
+    Write a chunk of (PlayerID, TweetID, SentimentScore) rows and move the
+    checkpoint forward in one transaction, so an interrupted job never
+    loses or double counts a chunk.
+    """
+
+    with db_conn:
+        db_conn.executemany(
+            f"""
+            INSERT INTO Sentiment (PlayerID, TweetID, SentimentScore, ModelVersion, ChangeSeq)
+            VALUES (?, ?, ?, ?, {NEXT_CHANGE_SEQ})
+            ON CONFLICT (PlayerID, TweetID) DO UPDATE SET
+                SentimentScore = excluded.SentimentScore,
+                ModelVersion = excluded.ModelVersion,
+                ChangeSeq = {NEXT_CHANGE_SEQ};
+            """,
+            [(player_id, tweet_id, score, model_version) for player_id, tweet_id, score in rows]
+        )
+        db_conn.execute(
+            """
+            INSERT INTO RescoreCheckpoint (ModelVersion, LastTweetID, RowsScored)
+            VALUES (?, ?, ?)
+            ON CONFLICT (ModelVersion) DO UPDATE SET
+                LastTweetID = excluded.LastTweetID,
+                RowsScored = excluded.RowsScored;
+            """,
+            (model_version, last_tweet_id, rows_scored)
+        )
+
+
+def fetch_sentiment_changes_after(db_conn, last_change_seq, chunk_size):
+    """Get the next chunk of joined Players/Tweets/Sentiment rows written after last_change_seq, ordered by ChangeSeq"""
+
+    # seek on the ChangeSeq index and join Tweets on its primary key,
+    # so every chunk is an index lookup instead of a scan of the whole table
+    return db_conn.execute(
+        """
+        SELECT
+            s.PlayerID,
+            p.GovName,
+            s.TweetID,
+            t.TweetText,
+            t.DateTimeCreated,
+            s.SentimentScore,
+            s.ModelVersion,
+            s.ChangeSeq
+        FROM Sentiment s
+        JOIN Tweets t ON t.TweetID = s.TweetID
+        LEFT JOIN Players p ON s.PlayerID = p.PlayerID
+        WHERE s.ChangeSeq > ?
+        ORDER BY s.ChangeSeq
+        LIMIT ?;
+        """,
+        (last_change_seq, chunk_size)
+    ).fetchall()
+
+
 # used for debugging. 
 def print_sentiment_and_tweets():
     """Create and print a view that combines Sentiment, Players, and Tweets tables"""
 
+    # rebuild the view so databases that already had it pick up new columns
+    cur.execute("DROP VIEW IF EXISTS SentimentView;")
     cur.execute("""
-    CREATE VIEW IF NOT EXISTS SentimentView AS
+    CREATE VIEW SentimentView AS
     SELECT
         s.PlayerID,
         p.GovName,
         s.TweetID,
         t.TweetText,
         t.DateTimeCreated,
-        s.SentimentScore
+        s.SentimentScore,
+        s.ModelVersion
     FROM Sentiment s
     LEFT JOIN Players p ON s.PlayerID = p.PlayerID
     LEFT JOIN Tweets t ON s.TweetID = t.TweetID
@@ -0,0 +1,318 @@
+"""
+Filename: Export.py
+
+Description:
+    Exports sentiment data from tweets.db into columnar Parquet snapshots so
+    analysts can run heavy reads without holding the SQLite lock that the live
+    API writes through. Joined Players/Tweets/Sentiment rows are streamed in
+    chunks and written into hive-style partitions by player and date.
+    Exports are incremental: a small manifest keeps the last exported ChangeSeq,
+    and the next run only appends rows written after that, including tweets
+    that were rescored. Readers keep the latest copy of each tweet, and --full
+    rebuilds the snapshots from scratch. Also provides helpers to read the
+    snapshots back as Arrow tables and aggregate them with NumPy.
+
+Author: Rahul Pothineni
+Created: 2026-10-19 - Present
+
+Dependencies:
+    - pyarrow
+    - numpy
+    - sqlite3
+    - argparse
+
+Usage:
+    python Export.py
+    python Export.py --export-dir exports --chunk-size 50000
+    python Export.py --full
+    python Export.py --summary
+"""
+
+import argparse
+import json
+import os
+import shutil
+from collections import defaultdict
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+EXPORT_DIR = "exports"
+MANIFEST_FILE = "_manifest.json"
+DEFAULT_CHUNK_SIZE = 10000 # rows pulled from the db at a time, keeps memory bounded
+
+# same thresholds the live summary in Sentiment.py uses
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# columns stored inside each file. PlayerID and Date live in the folder names
+FILE_SCHEMA = pa.schema([
+    ("GovName", pa.string()),
+    ("TweetID", pa.int64()),
+    ("TweetText", pa.string()),
+    ("DateTimeCreated", pa.string()),
+    ("SentimentScore", pa.float64()),
+    ("ModelVersion", pa.string()),
+    ("ChangeSeq", pa.int64()),
+])
+
+PARTITION_SCHEMA = pa.schema([
+    ("PlayerID", pa.int64()),
+    ("Date", pa.string()),
+])
+
+# formats DateTimeCreated shows up in: twitter's created_at, which is what
+# Extract.extract_created_at stores, and ISO dates if the API returns those.
+# tweets saved before post times were stored go to the "unknown" partition
+DATE_FORMATS = ["%a %b %d %H:%M:%S %z %Y", "%Y-%m-%d"]
+
+
+# ==============================
+# Manifest Methods
+
+def load_manifest(export_dir=EXPORT_DIR):
+    """Load the export manifest, or an empty one if nothing was exported yet"""
+    path = os.path.join(export_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {"last_change_seq": 0, "rows_written": 0}
+
+
+def save_manifest(manifest, export_dir=EXPORT_DIR):
+    """Save the manifest through a temp file so a crash never leaves it half written"""
+    path = os.path.join(export_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ==============================
+# Export Methods
+
+def partition_date(date_time_created):
+    """
+    Turns DateTimeCreated into a YYYY-MM-DD partition value.
+    Anything we can't parse goes into the "unknown" partition.
+    """
+    value = (date_time_created or "").strip()
+
+    for date_format in DATE_FORMATS:
+        try:
+            # ISO timestamps only need their date part
+            text = value[:10] if date_format == "%Y-%m-%d" else value
+            return datetime.strptime(text, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+
+    return "unknown"
+
+
+def clear_export(export_dir=EXPORT_DIR):
+    """Delete the partition folders and manifest so the next export starts over"""
+    if not os.path.isdir(export_dir):
+        return
+
+    # only touch what the export wrote, in case the folder holds anything else
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        if name.startswith("PlayerID=") and os.path.isdir(path):
+            shutil.rmtree(path)
+
+    manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def write_chunk(rows, export_dir):
+    """Group a chunk of rows by (PlayerID, Date) and write one Parquet file per partition"""
+
+    partitions = defaultdict(list)
+    for row in rows:
+        player_id, _, _, _, date_time_created, _, _, _ = row
+        partitions[(player_id, partition_date(date_time_created))].append(row)
+
+    for (player_id, date), partition_rows in partitions.items():
+        folder = os.path.join(export_dir, f"PlayerID={player_id}", f"Date={date}")
+        os.makedirs(folder, exist_ok=True)
+
+        table = pa.table(
+            {
+                "GovName": [row[1] for row in partition_rows],
+                "TweetID": [row[2] for row in partition_rows],
+                "TweetText": [row[3] for row in partition_rows],
+                "DateTimeCreated": [row[4] for row in partition_rows],
+                "SentimentScore": [row[5] for row in partition_rows],
+                "ModelVersion": [row[6] for row in partition_rows],
+                "ChangeSeq": [row[7] for row in partition_rows],
+            },
+            schema=FILE_SCHEMA
+        )
+
+        # write under a "_" name (the dataset reader skips those) and rename it in,
+        # so a crash never leaves a half written file behind. a chunk rerun after
+        # a crash can still overlap an earlier file, read_sentiment dedupes that
+        first_seq = partition_rows[0][7]
+        last_seq = partition_rows[-1][7]
+        file_name = f"part-{first_seq}-{last_seq}.parquet"
+        tmp_path = os.path.join(folder, "_" + file_name)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(folder, file_name))
+
+
+def export_sentiment(export_dir=EXPORT_DIR, chunk_size=DEFAULT_CHUNK_SIZE, full=False):
+    """
+    Exports every Sentiment row written or rescored since the last snapshot
+    and returns how many rows were written this run.
+    With full=True the old snapshots are deleted and everything is exported again.
+    """
+
+    if full:
+        clear_export(export_dir)
+
+    os.makedirs(export_dir, exist_ok=True)
+    manifest = load_manifest(export_dir)
+    last_change_seq = manifest.get("last_change_seq", 0)
+
+    # imported here and not at the top: importing Database opens tweets.db and
+    # runs its migrations, and the read methods below must never touch the db
+    import Database
+
+    # the export gets its own connection and only holds the read lock
+    # for one chunk at a time, so the live writers aren't blocked for long
+    db_conn = Database.get_conn()
+
+    try:
+        print(f"Exporting rows after ChangeSeq {last_change_seq} to '{export_dir}'")
+        exported_this_run = 0
+
+        while True:
+            rows = Database.fetch_sentiment_changes_after(db_conn, last_change_seq, chunk_size)
+            if not rows:
+                break
+
+            write_chunk(rows, export_dir)
+
+            last_change_seq = rows[-1][7]
+            exported_this_run += len(rows)
+            manifest["last_change_seq"] = last_change_seq
+            manifest["rows_written"] = manifest.get("rows_written", 0) + len(rows)
+            manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+            save_manifest(manifest, export_dir)
+
+            print(f"{exported_this_run} rows exported - last ChangeSeq {last_change_seq}")
+    finally:
+        db_conn.close()
+
+    print("\n===== EXPORT SUMMARY =====")
+    print(f"Exported this run: {exported_this_run}")
+    print(f"Total written: {manifest['rows_written']}")
+
+    return exported_this_run
+
+
+# ==============================
+# Read Methods
+
+def latest_rows(table):
+    """Keep only the copy of each TweetID with the highest ChangeSeq"""
+
+    tweet_ids = table.column("TweetID").to_numpy()
+    change_seqs = table.column("ChangeSeq").to_numpy()
+
+    # sort by TweetID, newest ChangeSeq first, then keep the first row of each TweetID
+    order = np.lexsort((-change_seqs, tweet_ids))
+    sorted_ids = tweet_ids[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = sorted_ids[1:] != sorted_ids[:-1]
+
+    return table.take(order[keep])
+
+
+def read_sentiment(export_dir=EXPORT_DIR, player_ids=None, columns=None):
+    """
+    Reads the exported snapshots back as a pyarrow Table, with one row per
+    tweet holding its latest score. Filtering on player_ids only opens the
+    matching partitions.
+    """
+
+    # nothing exported yet, hand back an empty table instead of failing
+    if not os.path.isdir(export_dir):
+        table = pa.unify_schemas([FILE_SCHEMA, PARTITION_SCHEMA]).empty_table()
+        return table.select(columns) if columns is not None else table
+
+    # the manifest starts with "_" so the dataset skips it on its own
+    dataset = ds.dataset(
+        export_dir,
+        format="parquet",
+        schema=pa.unify_schemas([FILE_SCHEMA, PARTITION_SCHEMA]),
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+    )
+
+    filter_expr = None
+    if player_ids is not None:
+        filter_expr = ds.field("PlayerID").isin(list(player_ids))
+
+    # TweetID and ChangeSeq are always read since deduping needs them
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns) + [c for c in ("TweetID", "ChangeSeq") if c not in columns]
+
+    table = latest_rows(dataset.to_table(columns=read_columns, filter=filter_expr))
+    return table.select(columns) if columns is not None else table
+
+
+def sentiment_summary(export_dir=EXPORT_DIR, player_ids=None):
+    """
+    Aggregates the exported scores per player with NumPy.
+    Returns {PlayerID: summary dict} in the same shape the API returns.
+    """
+
+    table = read_sentiment(export_dir, player_ids, columns=["PlayerID", "SentimentScore"])
+    if table.num_rows == 0:
+        return {}
+
+    player_column = table.column("PlayerID").to_numpy()
+    scores = table.column("SentimentScore").to_numpy()
+
+    # one pass over the scores: map every row to its player's slot and let
+    # bincount add up the counts, sums and threshold hits per player
+    player_ids, slots = np.unique(player_column, return_inverse=True)
+    counts = np.bincount(slots)
+    totals = np.bincount(slots, weights=scores)
+    positives = np.bincount(slots, weights=scores > POSITIVE_THRESHOLD)
+    negatives = np.bincount(slots, weights=scores < NEGATIVE_THRESHOLD)
+
+    summary = {}
+    for player_id, count, total, positive, negative in zip(player_ids, counts, totals, positives, negatives):
+        summary[int(player_id)] = {
+            "tweets_analyzed": int(count),
+            "average_polarity": float(total / count),
+            "positive": int(positive),
+            "negative": int(negative),
+            "neutral": int(count - positive - negative)
+        }
+
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export sentiment data to partitioned Parquet snapshots.")
+    parser.add_argument("--export-dir", default=EXPORT_DIR,
+                        help="folder the snapshots and manifest are written to")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows read from the db per chunk")
+    parser.add_argument("--full", action="store_true",
+                        help="delete the old snapshots and export everything again")
+    parser.add_argument("--summary", action="store_true",
+                        help="print per player aggregates from the snapshots instead of exporting")
+    args = parser.parse_args()
+
+    if args.summary:
+        for player_id, player_summary in sentiment_summary(args.export_dir).items():
+            print(player_id, player_summary)
+    else:
+        export_sentiment(export_dir=args.export_dir, chunk_size=args.chunk_size, full=args.full)
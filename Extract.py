@@ -4,8 +4,8 @@ Filename: Extract.py
 Description:
     Collects tweets using the twitter-api45 RapidAPI endpoint. 
     Includes methods to extract list of tweets from JSON files, 
-    individual tweets from the list found in the JSON, and keep 
-    track of the pagination cursor.
+    individual tweets from the list found in the JSON, when each
+    tweet was posted, and keep track of the pagination cursor.
 
 Author: Rahul Pothineni
 Created: 2025-12-05 - Present
@@ -76,6 +76,20 @@ def extract_text(tweet):
     return ""
 
 
+def extract_created_at(tweet):
+    '''
+    Extracts when the tweet was posted, as the API returned it.
+    '''
+    # check common fields where the post time may be stored
+    for key in ["created_at", "createdAt", "date", "timestamp"]:
+        value = tweet.get(key)
+
+        # if the value is a non-empty string we found the post time
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    # catch all - no post time was found
+    return ""
+
 def extract_cursor(response_json):
     '''
     Retrives a token to tell us what page to search on.
@@ -0,0 +1,124 @@
+"""
+Filename: Rescore.py
+
+Description:
+    Offline job that recomputes SentimentScore for tweets already stored in
+    tweets.db, e.g. after switching models or changing the scoring settings.
+    Streams the Tweets table in keyset-paginated chunks, scores each chunk with
+    the batched scorer in Sentiment.py, and writes the results back in one
+    transaction per chunk. Tweets already scored with the current model version
+    are skipped. Progress is checkpointed per model version while the job runs,
+    so an interrupted job picks up where it left off when run again.
+
+Author: Rahul Pothineni
+Created: 2026-10-19 - Present
+
+Dependencies:
+    - sqlite3
+    - argparse
+    - transformers (through Sentiment)
+
+Usage:
+    python Rescore.py
+    python Rescore.py --chunk-size 5000 --batch-size 64
+    python Rescore.py --restart
+"""
+
+import argparse
+import time
+import Database
+import Sentiment
+
+DEFAULT_CHUNK_SIZE = 2000 # rows pulled from the db at a time, keeps memory bounded
+
+
+def rescore_tweets(
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = Sentiment.BATCH_SIZE,
+    restart: bool = False
+):
+    """
+    Rescores every stored tweet with the current model and returns
+    the total number of rows scored for this model version.
+    """
+
+    # the version always comes from the model and settings score_texts uses,
+    # so every score is labeled with what actually produced it
+    model_version = Sentiment.MODEL_VERSION
+
+    # the job gets its own connection so its write transactions
+    # don't get mixed up with the live API's commits
+    db_conn = Database.get_conn()
+    db_conn.execute("PRAGMA foreign_keys = ON;")
+
+    try:
+        if restart:
+            Database.reset_rescore_checkpoint(db_conn, model_version)
+
+        last_tweet_id, rows_scored = Database.get_rescore_checkpoint(db_conn, model_version)
+        remaining = Database.count_tweets_after(db_conn, last_tweet_id, model_version)
+        total = rows_scored + remaining
+
+        if last_tweet_id:
+            print(f"Resuming {model_version} after TweetID {last_tweet_id} ({rows_scored}/{total} done)")
+        else:
+            print(f"Rescoring {total} tweets with {model_version}")
+
+        start_time = time.time()
+        scored_this_run = 0
+
+        while True:
+            rows = Database.fetch_tweets_after(db_conn, last_tweet_id, chunk_size, model_version)
+            if not rows:
+                break
+
+            texts = [tweet_text for _, tweet_text, _ in rows]
+            scores = Sentiment.score_texts(texts, batch_size=batch_size)
+
+            last_tweet_id = rows[-1][0]
+            rows_scored += len(rows)
+            scored_this_run += len(rows)
+
+            Database.bulk_upsert_sentiment(
+                db_conn,
+                [(player_id, tweet_id, score) for (tweet_id, _, player_id), score in zip(rows, scores)],
+                model_version,
+                last_tweet_id,
+                rows_scored
+            )
+
+            elapsed = time.time() - start_time
+            rate = scored_this_run / elapsed if elapsed else 0.0
+            percent = 100.0 * rows_scored / total if total else 100.0
+            print(f"{rows_scored}/{total} ({percent:.1f}%) - {rate:.1f} tweets/sec - last TweetID {last_tweet_id}")
+
+        # the checkpoint only tracks an interrupted run, once every tweet is done
+        # drop it so the same version can be rescored again later (e.g. a rollback)
+        Database.reset_rescore_checkpoint(db_conn, model_version)
+    finally:
+        # close even on Ctrl-C or a model error, the checkpoint keeps the progress
+        db_conn.close()
+
+    print("\n===== RESCORE SUMMARY =====")
+    print(f"Model version: {model_version}")
+    print(f"Scored this run: {scored_this_run}")
+    print(f"Total scored: {rows_scored}")
+
+    return rows_scored
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute sentiment scores for stored tweets.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="tweets read from the db per transaction")
+    parser.add_argument("--batch-size", type=int, default=Sentiment.BATCH_SIZE,
+                        help="tweets sent through the model at once")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the saved checkpoint and start from the first tweet")
+    args = parser.parse_args()
+
+    rescore_tweets(
+        chunk_size=args.chunk_size,
+        batch_size=args.batch_size,
+        restart=args.restart
+    )
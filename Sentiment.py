@@ -12,6 +12,7 @@ Created: 2025-12-05 - Present
 
 Dependencies:
     - requests
+    - torch
     - transformers
 
 
@@ -32,9 +33,12 @@ No model weights were modified or retrained in this project.
 
 import Database
 import Extract
+import re
 import requests
 import statistics
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+import torch
+from functools import lru_cache
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from PlayerRAG import PlayerRAG
 
 RAPIDAPI_KEY = Extract.RAPIDAPI_KEY
@@ -42,12 +46,98 @@ RAPIDAPI_HOST = Extract.RAPIDAPI_HOST
 
 BASE_URL = f"https://{RAPIDAPI_HOST}/search.php"
 
+# ==============================
+# SCORING CONFIG
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+MAX_TOKEN_LENGTH = 128 # tweets are short, anything past this is threads/quotes
+BATCH_SIZE = 32 # how many tweets go through the model at once
+
+# stored next to every score so we know which model/settings produced it.
+# bump this when the model or the truncation length changes
+MODEL_VERSION = f"{MODEL_NAME}@max{MAX_TOKEN_LENGTH}"
+
+# cardiffnlp only masks whitespace separated tokens that start with "http" or "@",
+# so emails like foo@bar.com are left alone
+URL_PATTERN = re.compile(r"(?<!\S)http\S*")
+HANDLE_PATTERN = re.compile(r"(?<!\S)@\w+")
+
 #Load the sentiment model
-tokenizer = AutoTokenizer.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment-latest")
-model = AutoModelForSequenceClassification.from_pretrained("cardiffnlp/twitter-roberta-base-sentiment-latest")
+tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+model.eval()
+
+# RAG is created on the first search, so offline jobs that only need
+# score_texts (like Rescore.py) don't need an OpenAI key to start
+rag = None
+
+
+def get_rag():
+    """Initialize the RAG once and reuse it"""
+    global rag
+    if rag is None:
+        rag = PlayerRAG()
+    return rag
+
 
-# Initialize RAG
-rag = PlayerRAG()
+# ==============================
+# Scoring Methods
+
+def normalize_text(text):
+    """
+    Masks links and user handles the same way the cardiffnlp model
+    was trained ("http" and "@user"), so they don't eat up tokens.
+    """
+    text = URL_PATTERN.sub("http", text)
+    text = HANDLE_PATTERN.sub("@user", text)
+    return text.strip()
+
+
+@lru_cache(maxsize=4096)
+def encode_text(text, max_length=MAX_TOKEN_LENGTH):
+    """
+    Tokenizes a normalized tweet and truncates it to max_length tokens.
+    Cached so repeated texts (retweets, copy-paste posts) are only tokenized once.
+    """
+    encoded = tokenizer(text, truncation=True, max_length=max_length)
+    return tuple(encoded["input_ids"])
+
+
+def score_texts(texts, batch_size=BATCH_SIZE, max_length=MAX_TOKEN_LENGTH):
+    """
+    Runs sentiment analysis over a list of tweets and returns one signed
+    score per tweet, in the same order as the input.
+    Negative tweets get a negative score, everything else stays positive.
+    """
+    if not texts:
+        return []
+
+    encoded = [encode_text(normalize_text(text), max_length) for text in texts]
+
+    # sort by token length so each batch only pads up to similar sized tweets,
+    # a few long tweets won't blow up the padding for the short ones
+    order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+    scores = [0.0] * len(encoded)
+
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        batch = tokenizer.pad(
+            {"input_ids": [list(encoded[i]) for i in batch_idx]},
+            return_tensors="pt"
+        )
+
+        with torch.no_grad():
+            probs = model(**batch).logits.softmax(dim=-1)
+
+        # same as the pipeline output: take the top label and its probability
+        top_scores, top_labels = probs.max(dim=-1)
+        for i, score, label in zip(batch_idx, top_scores.tolist(), top_labels.tolist()):
+            if model.config.id2label[label].lower() == "negative":
+                scores[i] = -score
+            else:
+                scores[i] = score
+
+    return scores
 
 def analyze_twitter_sentiment(
     query: str,
@@ -64,14 +154,13 @@ def analyze_twitter_sentiment(
         "X-RapidAPI-Host": RAPIDAPI_HOST
     }
 
-    sentiment_task = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
     polarities = [] # list of polarites for all tweets
     analyzed_count = 0 # amount of tweets analyzed
     cursor = None # pragmentation cursor
     phrase_lower = phrase.lower() #consistency 
 
     # Resolve player using Claude (synchronous, no async needed)
-    player_info = rag.retrieve_player_info(query)
+    player_info = get_rag().retrieve_player_info(query)
     if not player_info:
         print(f"Could not resolve player: {query}")
         return
@@ -112,9 +201,11 @@ def analyze_twitter_sentiment(
         if not tweets:
             break
         
-        # anylzing tweets one by one 
+        # collect the tweets on this page that we want to analyze
+        page_texts = []
+        page_dates = []
         for tweet in tweets:
-            if analyzed_count >= limit:
+            if analyzed_count + len(page_texts) >= limit:
                 break
             
             # move to the next tweet if the current one isn't parsable
@@ -129,15 +220,15 @@ def analyze_twitter_sentiment(
             # checks if the user phrase is in the tweet, if not move to the next tweet
             if phrase_lower and phrase_lower not in text.lower():
                 continue
-            
-            # creates sentiment for the tweet.
-            # sentiment comes out from the model like this: [{'label': 'Negative', 'score': 0.7236}],
-            # so we grab the "score" aka our sentiment score and the sign of the sentiment from "label"
-            sentiment_temp_dict = sentiment_task(text)
-            if(sentiment_temp_dict[0]["label"].lower() == "negative"):
-                sentiment = -sentiment_temp_dict[0]["score"]
-            else: sentiment = sentiment_temp_dict[0]["score"]
 
+            page_texts.append(text)
+            page_dates.append(Extract.extract_created_at(tweet))
+
+        # creates sentiment for the whole page at once, batched by token length.
+        # a negative score means the model labeled the tweet as negative
+        page_scores = score_texts(page_texts)
+
+        for text, created_at, sentiment in zip(page_texts, page_dates, page_scores):
             polarities.append(sentiment)
             analyzed_count += 1
 
@@ -148,7 +239,7 @@ def analyze_twitter_sentiment(
             print("-" * 60)
 
             # call to insert tweet into the db
-            Database.insert_tweet(text, sentiment, "  ", player_id)
+            Database.insert_tweet(text, sentiment, created_at, player_id, MODEL_VERSION)
 
         # checks if there is anymore data from the next page (pagination cursor)
         cursor = Extract.extract_cursor(data)